@@ -3,13 +3,15 @@ Task Manager application using Tkinter and OpenAI GPT scheduling assistance.
 """
 from __future__ import annotations
 
+import hashlib
+import heapq
+import io
 import json
 import os
 import threading
-import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 try:
     from openai import OpenAI
@@ -28,6 +30,182 @@ WEEKDAYS = [
     "Saturday",
     "Sunday",
 ]
+DAY_ORDER: Dict[str, int] = {day: index for index, day in enumerate(WEEKDAYS)}
+
+# Clicks on "Generate Schedule" within this window collapse into one GPT request.
+SCHEDULE_DEBOUNCE_MS = 250
+
+# Availability grid geometry, in pixels.
+GRID_CELL_WIDTH = 64
+GRID_CELL_HEIGHT = 22
+GRID_LABEL_WIDTH = 50
+GRID_HEADER_HEIGHT = 24
+
+# Output token budget for a schedule: a floor for the seven-day skeleton plus an
+# allowance per task and goal, capped at MAX_OUTPUT_TOKENS. Reasoning models spend
+# part of max_output_tokens on reasoning, so they always get the full budget.
+MAX_OUTPUT_TOKENS = 1500
+BASE_OUTPUT_TOKENS = 400
+OUTPUT_TOKENS_PER_ITEM = 60
+REASONING_MODEL_PREFIXES = ("gpt-5", "o1", "o3", "o4")
+
+# Previously generated schedules, keyed by a hash of the model, system prompt and
+# request context. The oldest entries are evicted beyond SCHEDULE_CACHE_MAX_ENTRIES.
+SCHEDULE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".taskmanager_cache.json")
+SCHEDULE_CACHE_MAX_ENTRIES = 50
+
+
+SCHEDULE_EXAMPLE = {
+    "days": {
+        "Monday": [
+            {
+                "title": "Thesis writing sprint",
+                "start": "09:00",
+                "end": "11:00",
+                "details": "Goal: Finish thesis. Draft the methods section and outline results.",
+            },
+            {
+                "title": "Admin batch",
+                "start": "14:00",
+                "end": "14:45",
+                "details": "Unaligned: reply to emails, pay rent, book dentist appointment.",
+            },
+        ],
+        "Tuesday": [
+            {
+                "title": "Interval run + stretching",
+                "start": "07:00",
+                "end": "08:00",
+                "details": "Goal: Run a half marathon. 6x400m intervals, 15 minutes of mobility work.",
+            }
+        ],
+        "Wednesday": [],
+        "Thursday": [
+            {
+                "title": "Thesis figures and references",
+                "start": "16:00",
+                "end": "17:30",
+                "details": "Goal: Finish thesis. Regenerate plots, fix citation formatting.",
+            }
+        ],
+        "Friday": [],
+        "Saturday": [
+            {
+                "title": "Long run",
+                "start": "08:30",
+                "end": "10:00",
+                "details": "Goal: Run a half marathon. Easy pace, 14 km.",
+            }
+        ],
+        "Sunday": [],
+    }
+}
+
+# The system prompt is kept byte-identical across requests and long enough (over
+# 1024 tokens) for OpenAI's automatic prompt caching to reuse the prefix; all
+# per-user data goes last, in the user message.
+SCHEDULER_INSTRUCTIONS = (
+    "You are an AI task scheduler that plans a single upcoming week for one person. "
+    "You receive a JSON document describing their long-term goals, the tasks they want to "
+    "complete this week, and the hours in which they are already busy. You reply with a "
+    "weekly plan made of focus blocks.\n"
+    "\n"
+    "INPUT FORMAT\n"
+    "- goals: list of long-term goals, each with name, difficulty and notes.\n"
+    "- goal_focus: this week's tasks grouped by the goal they advance. Each entry has goal, "
+    "difficulty, notes and tasks, a list of tasks with name, duration_hours, difficulty and "
+    "notes. Tasks without a goal appear under the pseudo-goal \"Unaligned\".\n"
+    "- busy: an object keyed by weekday name. Each value is a list of {start, end, title} "
+    "intervals (HH:MM, 24h clock) in which the person is unavailable.\n"
+    "\n"
+    "OUTPUT FORMAT\n"
+    "Return a single JSON object and nothing else: no prose, no markdown fences. The object "
+    "has exactly one top-level field, \"days\". Its value is an object whose keys are the "
+    "weekday names " + ", ".join(WEEKDAYS) + ", spelled exactly like that and in that "
+    "order. Each value is an ordered list (earliest first) of focus blocks. A day with "
+    "nothing planned maps to an empty list. Every focus block is an object with these "
+    "fields:\n"
+    "- title: short label for the block (under 60 characters).\n"
+    "- start: start time as HH:MM on a 24h clock, zero padded (e.g. 07:30).\n"
+    "- end: end time as HH:MM on a 24h clock, zero padded, strictly after start and on the "
+    "same day (never later than 23:59).\n"
+    "- details: one or two sentences naming the goal the block advances (or \"Unaligned\") "
+    "and every task it covers.\n"
+    "\n"
+    "SCHEDULING RULES\n"
+    "1. Never place a block that overlaps any busy interval on the same day, not even by a "
+    "minute. A block may start exactly when a busy interval ends and may end exactly when "
+    "one starts.\n"
+    "2. Blocks on the same day must not overlap each other.\n"
+    "3. Bundle related tasks into shared focus blocks when possible, especially tasks tied "
+    "to the same goal. Avoid mapping each task to its own block unless it is large enough "
+    "to need dedicated time.\n"
+    "4. The total scheduled time for a task across the week should match its "
+    "duration_hours. Split long tasks (more than about two hours) over several days "
+    "instead of one marathon session.\n"
+    "5. Balance workload across the week and mix easy and difficult sessions; avoid stacking "
+    "several High difficulty blocks back to back on the same day.\n"
+    "6. Leave at least 15 minutes between consecutive focus blocks and keep free time for "
+    "meals. Prefer scheduling between 07:00 and 22:00 unless the busy data shows the "
+    "person is usually active outside those hours.\n"
+    "7. Use task and goal notes as hints for timing (for example \"mornings only\" or "
+    "\"before Thursday\").\n"
+    "8. If the tasks cannot all fit in the free time, schedule the most important and most "
+    "goal-aligned work first and mention what was left out in the details of the last "
+    "block of the week.\n"
+    "\n"
+    "DIFFICULTY RUBRIC\n"
+    "- Low: routine or administrative work that needs little concentration. Fits in short "
+    "gaps, late in the day, or bundled with other Low tasks.\n"
+    "- Medium: work that needs steady attention but not deep focus. Blocks of 45 to 90 "
+    "minutes work well, at any reasonable time of day.\n"
+    "- High: demanding work that needs deep focus. Schedule in the person's freshest hours "
+    "(usually mornings), in blocks of 60 to 120 minutes, at most two High blocks per day, "
+    "each followed by a break or a Low difficulty block.\n"
+    "Goal difficulty describes the overall goal; use it to decide how much of the week the "
+    "goal deserves relative to other goals.\n"
+    "\n"
+    "COMMON MISTAKES TO AVOID\n"
+    "- Using 12h times such as 9:00 PM, or omitting the leading zero (9:00 instead of "
+    "09:00).\n"
+    "- Abbreviating weekday names (Mon, Tue) or adding dates to them.\n"
+    "- Producing one block per task when several small tasks of the same goal could share "
+    "a block.\n"
+    "- Placing work inside busy intervals because they look short; every busy interval is "
+    "a hard constraint.\n"
+    "- Wrapping the JSON in explanations or code fences.\n"
+    "\n"
+    "EXAMPLE\n"
+    "For a person who is busy Monday 11:00-14:00 and Tuesday 09:00-17:00, with the goals "
+    "\"Finish thesis\" (High) and \"Run a half marathon\" (Medium), a valid reply looks "
+    "like this:\n"
+    + json.dumps(SCHEDULE_EXAMPLE, indent=2)
+    + "\n"
+    "The example only illustrates the format; always plan from the actual input."
+)
+
+
+def _hhmm_to_min(value: str) -> int:
+    """Convert an HH:MM (or H:MM) string, 00:00 to 24:00, to minutes since midnight."""
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid time {value!r}; expected HH:MM")
+    if len(value) == 5 and value[2] == ":":
+        hours = int(value[0]) * 10 + int(value[1])
+        minutes = int(value[3]) * 10 + int(value[4])
+    else:
+        hour_text, _, minute_text = value.partition(":")
+        if not (
+            1 <= len(hour_text) <= 2
+            and len(minute_text) == 2
+            and (hour_text + minute_text).isascii()
+            and (hour_text + minute_text).isdigit()
+        ):
+            raise ValueError(f"Invalid time {value!r}; expected HH:MM")
+        hours = int(hour_text)
+        minutes = int(minute_text)
+    if minutes > 59 or hours * 60 + minutes > 24 * 60:
+        raise ValueError(f"Invalid time {value!r}; expected HH:MM")
+    return hours * 60 + minutes
 
 
 @dataclass
@@ -54,14 +232,17 @@ class TimeBlock:
     end_time: str
     details: str = ""
 
+    def __post_init__(self) -> None:
+        # Minutes since midnight, so overlap checks are plain integer comparisons.
+        self._start_min = _hhmm_to_min(self.start_time)
+        self._end_min = _hhmm_to_min(self.end_time)
+
     def overlaps(self, other: "TimeBlock") -> bool:
-        if self.day != other.day:
-            return False
-        start_a = datetime.strptime(self.start_time, "%H:%M")
-        end_a = datetime.strptime(self.end_time, "%H:%M")
-        start_b = datetime.strptime(other.start_time, "%H:%M")
-        end_b = datetime.strptime(other.end_time, "%H:%M")
-        return start_a < end_b and start_b < end_a
+        return (
+            self.day == other.day
+            and self._start_min < other._end_min
+            and other._start_min < self._end_min
+        )
 
 
 class GPTScheduler:
@@ -79,25 +260,28 @@ class GPTScheduler:
     def is_available(self) -> bool:
         return self.client is not None
 
-    def generate_schedule(self, context: Dict) -> Dict:
+    def _max_output_tokens(self, context: Dict) -> int:
+        if self.model.startswith(REASONING_MODEL_PREFIXES):
+            return MAX_OUTPUT_TOKENS
+        item_count = len(context.get("goals", [])) + sum(
+            len(focus["tasks"]) for focus in context.get("goal_focus", [])
+        )
+        return min(MAX_OUTPUT_TOKENS, BASE_OUTPUT_TOKENS + OUTPUT_TOKENS_PER_ITEM * item_count)
+
+    def generate_schedule(
+        self, context: Dict, on_progress: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """Stream a schedule from GPT, passing each text delta to ``on_progress`` as it arrives."""
         if not self.is_available():
             raise RuntimeError("OpenAI client not available")
 
-        instructions = (
-            "You are an AI task scheduler. Generate a JSON object with a 'days' field. "
-            "For each day in the upcoming week, provide an ordered list of focus blocks. "
-            "Each block must include title, start, end (HH:MM 24h), and details. Reference the "
-            "tasks and goals the block advances, and whenever possible bundle several related "
-            "tasks (especially those tied to the same goal) into a single block rather than "
-            "creating one block per task. Ensure you respect busy blocks and avoid conflicts."
-        )
-        prompt = json.dumps(context, indent=2)
-        response = self.client.responses.create(
+        prompt = json.dumps(context, separators=(",", ":"))
+        stream = self.client.responses.create(
             model=self.model,
             input=[
                 {
                     "role": "system",
-                    "content": instructions,
+                    "content": SCHEDULER_INSTRUCTIONS,
                 },
                 {
                     "role": "user",
@@ -105,11 +289,34 @@ class GPTScheduler:
                 },
             ],
             temperature=0.4,
-            max_output_tokens=1500,
+            max_output_tokens=self._max_output_tokens(context),
             response_format={"type": "json_object"},
+            stream=True,
         )
-        content = response.output[0].content[0].text  # type: ignore[assignment]
-        return json.loads(content)
+        chunks: List[str] = []
+        completed = False
+        with stream:
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    chunks.append(event.delta)
+                    if on_progress is not None:
+                        on_progress(event.delta)
+                elif event.type == "response.completed":
+                    completed = True
+                    break
+                elif event.type == "response.incomplete":
+                    details = getattr(event.response, "incomplete_details", None)
+                    reason = getattr(details, "reason", None) or "unknown reason"
+                    raise RuntimeError(f"Schedule response was incomplete ({reason}).")
+                elif event.type == "response.failed":
+                    error = getattr(event.response, "error", None)
+                    message = getattr(error, "message", None) or "unknown error"
+                    raise RuntimeError(f"Schedule generation failed: {message}")
+                elif event.type == "error":
+                    raise RuntimeError(f"Schedule generation failed: {getattr(event, 'message', event)}")
+        if not completed:
+            raise RuntimeError("Schedule response ended before it was completed.")
+        return json.loads("".join(chunks))
 
 
 class TaskManagerApp(tk.Tk):
@@ -121,10 +328,14 @@ class TaskManagerApp(tk.Tk):
         self.gpt = GPTScheduler()
         self.tasks: List[Task] = []
         self.goals: List[Goal] = []
-        self.busy_slots: Dict[str, List[Tuple[int, int]]] = {day: [] for day in WEEKDAYS}
+        self.busy_slots: Dict[str, Set[int]] = {day: set() for day in WEEKDAYS}
         self.generated_blocks: List[TimeBlock] = []
-        self.reminder_thread: Optional[threading.Thread] = None
-        self.stop_event = threading.Event()
+        self._busy_context_cache: Optional[Dict[str, List[Dict[str, str]]]] = None
+        self._pending_request_id: Optional[str] = None
+        self._schedule_cache: Dict[bytes, Dict] = self._load_schedule_cache()
+        self._last_cache_hit: Optional[bytes] = None
+        self.reminder_queue: List[Tuple[datetime, int, TimeBlock]] = []
+        self.reminder_id: Optional[str] = None
 
         self._build_ui()
 
@@ -178,22 +389,47 @@ class TaskManagerApp(tk.Tk):
         )
         ttk.Label(container, text=info, wraplength=400).grid(row=0, column=0, columnspan=8, pady=5)
 
-        self.availability_buttons: Dict[Tuple[str, int], tk.Button] = {}
+        # A single canvas draws the whole 7x24 grid; clicks are mapped back to cells.
+        self.availability_canvas = tk.Canvas(
+            container,
+            width=GRID_LABEL_WIDTH + len(WEEKDAYS) * GRID_CELL_WIDTH + 1,
+            height=GRID_HEADER_HEIGHT + 24 * GRID_CELL_HEIGHT + 1,
+            highlightthickness=0,
+        )
+        self.availability_canvas.grid(row=1, column=0, columnspan=8, padx=5, pady=5)
+
+        self.availability_cells: Dict[Tuple[str, int], int] = {}
         for col, day in enumerate(WEEKDAYS):
-            ttk.Label(container, text=day).grid(row=1, column=col + 1)
+            self.availability_canvas.create_text(
+                GRID_LABEL_WIDTH + col * GRID_CELL_WIDTH + GRID_CELL_WIDTH // 2,
+                GRID_HEADER_HEIGHT // 2,
+                text=day,
+            )
         for row in range(24):
-            hour_label = f"{row:02d}:00"
-            ttk.Label(container, text=hour_label).grid(row=row + 2, column=0, padx=5)
+            top = GRID_HEADER_HEIGHT + row * GRID_CELL_HEIGHT
+            self.availability_canvas.create_text(
+                GRID_LABEL_WIDTH // 2, top + GRID_CELL_HEIGHT // 2, text=f"{row:02d}:00"
+            )
             for col, day in enumerate(WEEKDAYS):
-                btn = tk.Button(
-                    container,
-                    width=6,
-                    relief=tk.RAISED,
-                    command=lambda d=day, h=row: self.toggle_busy(d, h),
-                    bg="white",
+                left = GRID_LABEL_WIDTH + col * GRID_CELL_WIDTH
+                self.availability_cells[(day, row)] = self.availability_canvas.create_rectangle(
+                    left,
+                    top,
+                    left + GRID_CELL_WIDTH,
+                    top + GRID_CELL_HEIGHT,
+                    fill="white",
+                    outline="#bbb",
+                    tags=("cell", f"{day}:{row}"),
                 )
-                btn.grid(row=row + 2, column=col + 1, padx=1, pady=1)
-                self.availability_buttons[(day, row)] = btn
+        self.availability_canvas.bind("<Button-1>", self._on_availability_click)
+
+    def _on_availability_click(self, event: tk.Event) -> None:
+        if event.x < GRID_LABEL_WIDTH or event.y < GRID_HEADER_HEIGHT:
+            return
+        col = (event.x - GRID_LABEL_WIDTH) // GRID_CELL_WIDTH
+        row = (event.y - GRID_HEADER_HEIGHT) // GRID_CELL_HEIGHT
+        if col < len(WEEKDAYS) and row < 24:
+            self.toggle_busy(WEEKDAYS[col], row)
 
     def _build_task_goal_editor(self, container: ttk.Frame) -> None:
         container.columnconfigure(0, weight=1)
@@ -222,7 +458,10 @@ class TaskManagerApp(tk.Tk):
 
         ttk.Label(task_frame, text="Related Goal (optional)").grid(row=3, column=0, sticky="w")
         self.task_goal_var = tk.StringVar()
-        self.task_goal_combo = ttk.Combobox(task_frame, textvariable=self.task_goal_var)
+        self.goal_choices: Tuple[str, ...] = ("None",)
+        self.task_goal_combo = ttk.Combobox(
+            task_frame, textvariable=self.task_goal_var, values=self.goal_choices
+        )
         self.task_goal_combo.grid(row=3, column=1, sticky="ew")
 
         ttk.Label(task_frame, text="Notes").grid(row=4, column=0, sticky="w")
@@ -268,21 +507,21 @@ class TaskManagerApp(tk.Tk):
 
     # Availability editing ------------------------------------------------
     def toggle_busy(self, day: str, hour: int) -> None:
-        slot = (day, hour)
-        btn = self.availability_buttons[slot]
-        busy_list = self.busy_slots[day]
+        cell = self.availability_cells[(day, hour)]
+        busy_set = self.busy_slots[day]
+        self._busy_context_cache = None
 
-        if hour in [h for h, _ in busy_list]:
-            busy_list[:] = [(h, dur) for h, dur in busy_list if h != hour]
-            btn.configure(bg="white", relief=tk.RAISED)
+        if hour in busy_set:
+            busy_set.discard(hour)
+            self.availability_canvas.itemconfigure(cell, fill="white")
         else:
-            busy_list.append((hour, 1))  # store duration=1 hour for grid simplicity
-            btn.configure(bg="#444", relief=tk.SUNKEN)
+            busy_set.add(hour)  # each grid cell is a one-hour slot
+            self.availability_canvas.itemconfigure(cell, fill="#444")
 
     # Task & goal management ---------------------------------------------
-    def refresh_task_goal_links(self) -> None:
-        goal_names = [goal.name for goal in self.goals]
-        self.task_goal_combo.configure(values=["None"] + goal_names)
+    def refresh_task_goal_links(self, goal_name: str) -> None:
+        self.goal_choices += (goal_name,)
+        self.task_goal_combo["values"] = self.goal_choices
 
     def add_task(self) -> None:
         name = self.task_name_var.get().strip()
@@ -322,7 +561,7 @@ class TaskManagerApp(tk.Tk):
         self.goal_listbox.insert(tk.END, f"{name} ({difficulty})")
         self.goal_name_var.set("")
         self.goal_notes_var.set("")
-        self.refresh_task_goal_links()
+        self.refresh_task_goal_links(name)
 
     # Schedule generation -------------------------------------------------
     def generate_schedule(self) -> None:
@@ -337,27 +576,111 @@ class TaskManagerApp(tk.Tk):
             )
             return
 
+        if self._pending_request_id is not None:
+            self.after_cancel(self._pending_request_id)
+        self._pending_request_id = self.after(SCHEDULE_DEBOUNCE_MS, self._dispatch_schedule)
+
+    def _dispatch_schedule(self) -> None:
+        self._pending_request_id = None
         context = self._build_schedule_context()
+        key = self._schedule_cache_key(context)
+        cached = self._schedule_cache.get(key)
+        # Generating again right after a cached plan was shown asks GPT for a fresh one.
+        if cached is not None and key != self._last_cache_hit:
+            self._last_cache_hit = key
+            self._on_schedule_ready(*self._parse_schedule(cached))
+            return
+        self._last_cache_hit = None
 
+        self.generate_button.configure(state="disabled")
+        self._set_schedule_text("")
+        threading.Thread(target=self._request_schedule, args=(context, key), daemon=True).start()
+
+    def _request_schedule(self, context: Dict, key: bytes) -> None:
         try:
-            schedule = self.gpt.generate_schedule(context)
+            schedule = self.gpt.generate_schedule(
+                context, on_progress=lambda delta: self.after(0, self._append_schedule_text, delta)
+            )
+            blocks, skipped = self._parse_schedule(schedule)
         except Exception as exc:
-            messagebox.showerror("Scheduling failed", str(exc))
+            self.after(0, self._on_schedule_failed, str(exc))
             return
-
-        blocks = self._parse_schedule(schedule)
-        conflicts = self._find_conflicts(blocks)
+        self.after(0, self._cache_schedule, key, schedule)
+        self.after(0, self._on_schedule_ready, blocks, skipped)
+
+    def _on_schedule_failed(self, message: str) -> None:
+        self.generate_button.configure(state="normal")
+        messagebox.showerror("Scheduling failed", message)
+
+    def _on_schedule_ready(self, blocks: List[TimeBlock], skipped: int) -> None:
+        self.generate_button.configure(state="normal")
+        if skipped:
+            messagebox.showwarning(
+                "Blocks skipped",
+                f"{skipped} scheduled block(s) had a missing field or an invalid time and were left out.",
+            )
+        busy_context = self._build_busy_context()
+        conflicts = self._find_conflicts(blocks, busy_context)
         if conflicts:
             conflict_text = "\n".join(conflicts)
             messagebox.showwarning("Conflicts detected", conflict_text)
 
         self.generated_blocks = blocks
-        self._display_schedule(blocks)
+        self._display_schedule(blocks, busy_context)
         self.start_reminders_button.configure(state="normal")
 
+    def _schedule_cache_key(self, context: Dict) -> bytes:
+        canonical = json.dumps(context, sort_keys=True, separators=(",", ":"))
+        hasher = hashlib.blake2b(digest_size=16)
+        for part in (self.gpt.model, SCHEDULER_INSTRUCTIONS, canonical):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.digest()
+
+    def _cache_schedule(self, key: bytes, schedule: Dict) -> None:
+        self._schedule_cache.pop(key, None)
+        self._schedule_cache[key] = schedule
+        while len(self._schedule_cache) > SCHEDULE_CACHE_MAX_ENTRIES:
+            del self._schedule_cache[next(iter(self._schedule_cache))]
+
+    def _load_schedule_cache(self) -> Dict[bytes, Dict]:
+        try:
+            with open(SCHEDULE_CACHE_PATH, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+            items = stored.items()
+        except (OSError, ValueError, AttributeError):
+            return {}
+        entries: List[Tuple[bytes, Dict]] = []
+        for key, schedule in items:
+            if not (isinstance(schedule, dict) and isinstance(schedule.get("days"), dict)):
+                continue
+            try:
+                entries.append((bytes.fromhex(key), schedule))
+            except (TypeError, ValueError):
+                continue
+        return dict(entries[-SCHEDULE_CACHE_MAX_ENTRIES:])
+
+    def _save_schedule_cache(self) -> None:
+        stored = {key.hex(): schedule for key, schedule in self._schedule_cache.items()}
+        try:
+            with open(SCHEDULE_CACHE_PATH, "w", encoding="utf-8") as handle:
+                json.dump(stored, handle)
+        except OSError:
+            pass
+
+    def _set_schedule_text(self, text: str) -> None:
+        self.schedule_text.configure(state="normal")
+        self.schedule_text.delete("1.0", tk.END)
+        self.schedule_text.insert(tk.END, text)
+        self.schedule_text.configure(state="disabled")
+
+    def _append_schedule_text(self, text: str) -> None:
+        self.schedule_text.configure(state="normal")
+        self.schedule_text.insert(tk.END, text)
+        self.schedule_text.configure(state="disabled")
+
     def _build_schedule_context(self) -> Dict:
         busy = self._build_busy_context()
-        tasks = [task.__dict__ for task in self.tasks]
         goals = [goal.__dict__ for goal in self.goals]
 
         tasks_by_goal: Dict[str, List[Dict[str, str]]] = {}
@@ -383,39 +706,55 @@ class TaskManagerApp(tk.Tk):
                     "tasks": tasks_by_goal.get(name, []),
                 }
             )
+        # goal_focus is the only place tasks are sent, so keep tasks whose goal
+        # name doesn't match a defined goal.
+        for name, goal_tasks in tasks_by_goal.items():
+            if name not in goal_lookup and name != "Unaligned":
+                goal_summaries.append({"goal": name, "difficulty": "", "notes": "", "tasks": goal_tasks})
         if "Unaligned" in tasks_by_goal:
             goal_summaries.append({"goal": "Unaligned", "difficulty": "", "notes": "", "tasks": tasks_by_goal["Unaligned"]})
 
         context = {
             "goals": goals,
-            "tasks": tasks,
             "busy": busy,
             "goal_focus": goal_summaries,
-            "guidelines": {
-                "bundle_tasks": "Group related tasks into shared focus blocks when possible.",
-                "balance": "Balance workload across the week and mix easy and difficult sessions.",
-                "avoid_single_task_blocks": "Avoid mapping each task to its own block unless necessary.",
-            },
         }
         return context
 
     def _build_busy_context(self) -> Dict[str, List[Dict[str, str]]]:
+        if self._busy_context_cache is not None:
+            return self._busy_context_cache
         busy_context: Dict[str, List[Dict[str, str]]] = {day: [] for day in WEEKDAYS}
-        for day, slots in self.busy_slots.items():
-            for hour, duration in slots:
-                start = f"{hour:02d}:00"
-                end_hour = hour + duration
-                end = f"{end_hour:02d}:00"
-                busy_context[day].append({"start": start, "end": end, "title": "Busy"})
+        for day, hours in self.busy_slots.items():
+            # Merge back-to-back hours so 09, 10 and 11 become a single 09:00-12:00 slot.
+            merged: List[List[int]] = []
+            for hour in sorted(hours):
+                if merged and merged[-1][1] == hour:
+                    merged[-1][1] = hour + 1
+                else:
+                    merged.append([hour, hour + 1])
+            for start_hour, end_hour in merged:
+                busy_context[day].append(
+                    {"start": f"{start_hour:02d}:00", "end": f"{end_hour:02d}:00", "title": "Busy"}
+                )
+        self._busy_context_cache = busy_context
         return busy_context
 
-    def _parse_schedule(self, schedule: Dict) -> List[TimeBlock]:
+    def _parse_schedule(self, schedule: Dict) -> Tuple[List[TimeBlock], int]:
+        """Return the valid blocks sorted by time, and how many entries were skipped."""
         blocks: List[TimeBlock] = []
+        skipped = 0
         days = schedule.get("days", {})
         for day, entries in days.items():
             if day not in WEEKDAYS:
                 continue
+            if not isinstance(entries, list):
+                skipped += 1
+                continue
             for entry in entries:
+                if not isinstance(entry, dict):
+                    skipped += 1
+                    continue
                 try:
                     block = TimeBlock(
                         title=entry["title"],
@@ -425,64 +764,71 @@ class TaskManagerApp(tk.Tk):
                         details=entry.get("details", ""),
                     )
                     blocks.append(block)
-                except KeyError:
-                    continue
-        return sorted(blocks, key=lambda b: (WEEKDAYS.index(b.day), b.start_time))
+                except (KeyError, ValueError):
+                    skipped += 1
+        return sorted(blocks, key=lambda b: (DAY_ORDER[b.day], b._start_min)), skipped
 
-    def _find_conflicts(self, blocks: List[TimeBlock]) -> List[str]:
+    def _find_conflicts(
+        self, blocks: List[TimeBlock], busy_context: Dict[str, List[Dict[str, str]]]
+    ) -> List[str]:
         messages: List[str] = []
-        busy_blocks = [
-            TimeBlock(title="Busy", day=day, start_time=slot["start"], end_time=slot["end"])
-            for day, slots in self._build_busy_context().items()
-            for slot in slots
-        ]
-
+        blocks_by_day: Dict[str, List[TimeBlock]] = {day: [] for day in WEEKDAYS}
         for block in blocks:
-            for busy in busy_blocks:
-                if block.overlaps(busy):
+            blocks_by_day[block.day].append(block)
+
+        for day in WEEKDAYS:
+            day_blocks = sorted(blocks_by_day[day], key=lambda b: b._start_min)
+            busy_blocks = sorted(
+                (
+                    TimeBlock(title="Busy", day=day, start_time=slot["start"], end_time=slot["end"])
+                    for slot in busy_context.get(day, [])
+                ),
+                key=lambda b: b._start_min,
+            )
+            # Busy slots never overlap each other, so once one ends before a block
+            # starts it cannot conflict with any later-starting block either.
+            first = 0
+            for block in day_blocks:
+                while first < len(busy_blocks) and busy_blocks[first]._end_min <= block._start_min:
+                    first += 1
+                if first < len(busy_blocks) and busy_blocks[first]._start_min < block._end_min:
                     messages.append(
                         f"{block.title} on {block.day} {block.start_time}-{block.end_time} overlaps busy time."
                     )
         return messages
 
-    def _display_schedule(self, blocks: List[TimeBlock]) -> None:
+    def _display_schedule(
+        self, blocks: List[TimeBlock], busy_context: Dict[str, List[Dict[str, str]]]
+    ) -> None:
         grouped: Dict[str, List[TimeBlock]] = {day: [] for day in WEEKDAYS}
         for block in blocks:
             grouped[block.day].append(block)
 
-        lines: List[str] = []
-        for day in WEEKDAYS:
-            lines.append(day)
-            lines.append("-" * len(day))
-            context_lines = self._day_context(day, grouped[day])
-            lines.extend(context_lines)
-            lines.append("")
+        buf = io.StringIO()
+        for index, day in enumerate(WEEKDAYS):
+            if index:
+                buf.write("\n")
+            buf.write(f"{day}\n{'-' * len(day)}\n")
+            self._day_context(buf, grouped[day], busy_context[day])
 
-        text = "\n".join(lines)
-        self.schedule_text.configure(state="normal")
-        self.schedule_text.delete("1.0", tk.END)
-        self.schedule_text.insert(tk.END, text)
-        self.schedule_text.configure(state="disabled")
+        self._set_schedule_text(buf.getvalue())
 
-    def _day_context(self, day: str, blocks: List[TimeBlock]) -> List[str]:
-        lines: List[str] = []
-        busy_slots = self._build_busy_context()[day]
+    def _day_context(
+        self, buf: io.StringIO, blocks: List[TimeBlock], busy_slots: List[Dict[str, str]]
+    ) -> None:
         if busy_slots:
-            lines.append("Existing commitments:")
+            buf.write("Existing commitments:\n")
             for slot in busy_slots:
-                lines.append(f"  {slot['start']}-{slot['end']}: {slot['title']}")
+                buf.write(f"  {slot['start']}-{slot['end']}: {slot['title']}\n")
         else:
-            lines.append("Existing commitments: None")
+            buf.write("Existing commitments: None\n")
 
         if blocks:
-            lines.append("Planned tasks:")
+            buf.write("Planned tasks:\n")
             for block in blocks:
-                lines.append(
-                    f"  {block.start_time}-{block.end_time}: {block.title} ({block.details})"
-                )
+                buf.write(f"  {block.start_time}-{block.end_time}: {block.title} ({block.details})\n")
         else:
-            lines.append("Planned tasks: None")
-        return lines
+            buf.write("Planned tasks: None\n")
 
     # Reminder handling ---------------------------------------------------
     def start_reminders(self) -> None:
@@ -490,40 +836,39 @@ class TaskManagerApp(tk.Tk):
             messagebox.showwarning("No schedule", "Generate a schedule first.")
             return
 
-        if self.reminder_thread and self.reminder_thread.is_alive():
+        if self.reminder_id is not None:
             messagebox.showinfo("Reminders running", "Reminders are already active.")
             return
 
-        self.stop_event.clear()
-        self.reminder_thread = threading.Thread(target=self._reminder_loop, daemon=True)
-        self.reminder_thread.start()
-        self.start_reminders_button.configure(state="disabled")
-        messagebox.showinfo("Reminders started", "Pop-up reminders will appear at the scheduled times.")
-
-    def _reminder_loop(self) -> None:
-        blocks_by_datetime: List[Tuple[datetime, TimeBlock]] = []
         now = datetime.now()
         monday = now - timedelta(days=now.weekday())
-
-        for block in self.generated_blocks:
-            day_index = WEEKDAYS.index(block.day)
+        for order, block in enumerate(self.generated_blocks):
+            day_index = DAY_ORDER[block.day]
             block_date = monday + timedelta(days=day_index)
-            start_hour, start_minute = map(int, block.start_time.split(":"))
-            block_dt = block_date.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
+            midnight = block_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            block_dt = midnight + timedelta(minutes=block._start_min)
             if block_dt < now:
                 block_dt += timedelta(weeks=1)
-            blocks_by_datetime.append((block_dt, block))
-
-        shown: set = set()
-        while not self.stop_event.is_set():
-            current = datetime.now()
-            for block_dt, block in blocks_by_datetime:
-                if block_dt <= current < block_dt + timedelta(minutes=1):
-                    identifier = (block.day, block.start_time, block.title)
-                    if identifier not in shown:
-                        self.after(0, self._show_reminder, block)
-                        shown.add(identifier)
-            time.sleep(30)
+            heapq.heappush(self.reminder_queue, (block_dt, order, block))
+
+        self._schedule_next_reminder()
+        self.start_reminders_button.configure(state="disabled")
+        messagebox.showinfo("Reminders started", "Pop-up reminders will appear at the scheduled times.")
+
+    def _schedule_next_reminder(self) -> None:
+        # Only the earliest pending reminder holds a Tk timer; the rest wait in the heap.
+        if not self.reminder_queue:
+            self.reminder_id = None
+            return
+        delay_ms = max(0, (self.reminder_queue[0][0] - datetime.now()).total_seconds() * 1000)
+        self.reminder_id = self.after(int(delay_ms), self._fire_due_reminders)
+
+    def _fire_due_reminders(self) -> None:
+        now = datetime.now()
+        while self.reminder_queue and self.reminder_queue[0][0] <= now:
+            _, _, block = heapq.heappop(self.reminder_queue)
+            self._show_reminder(block)
+        self._schedule_next_reminder()
 
     def _show_reminder(self, block: TimeBlock) -> None:
         popup = tk.Toplevel(self)
@@ -539,7 +884,13 @@ class TaskManagerApp(tk.Tk):
         ttk.Button(popup, text="Done", command=popup.destroy).pack(pady=10)
 
     def on_close(self) -> None:
-        self.stop_event.set()
+        if self._pending_request_id is not None:
+            self.after_cancel(self._pending_request_id)
+            self._pending_request_id = None
+        self._save_schedule_cache()
+        if self.reminder_id is not None:
+            self.after_cancel(self.reminder_id)
+            self.reminder_id = None
         self.destroy()
 
 